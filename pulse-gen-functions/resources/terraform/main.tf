@@ -76,6 +76,9 @@ resource "aws_iam_role_policy" "lambda_policy" {
       {
         Effect = "Allow"
         Action = [
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:DescribeTable",
           "dynamodb:GetItem",
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
@@ -166,6 +169,18 @@ resource "aws_dynamodb_table" "device_tokens" {
     projection_type = "ALL"
   }
 
+  attribute {
+    name = "is_active"
+    type = "N"
+  }
+
+  global_secondary_index {
+    name            = "active-index"
+    hash_key        = "is_active"
+    range_key       = "device_id"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name        = "pulse-device-tokens"
     Environment = "development"
@@ -188,12 +203,55 @@ resource "aws_lambda_function" "pulse_news_lambda" {
       SNS_PLATFORM_APPLICATION_ARN = local.sns_platform_application_arn
       SNS_TOPIC_ARN               = aws_sns_topic.pulse_notifications.arn
       DYNAMODB_TABLE_NAME         = aws_dynamodb_table.device_tokens.name
+      ASYNC_DISPATCH_TOPIC_ARN    = aws_sns_topic.notification_dispatch.arn
+    }
+  }
+
+  source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+}
+
+# SNS Topic for asynchronous notification dispatch
+resource "aws_sns_topic" "notification_dispatch" {
+  name = "pulse-notification-dispatch"
+}
+
+# Lambda function that delivers dispatched notifications
+resource "aws_lambda_function" "notification_dispatch_lambda" {
+  filename         = data.archive_file.lambda_zip.output_path
+  function_name    = "${var.project_sub_name}-dispatch-lambda"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "index.notificationDispatchHandler"
+  runtime         = "nodejs18.x"
+  timeout         = 60
+  memory_size     = 256
+
+  environment {
+    variables = {
+      NODE_ENV = "production"
+      SNS_PLATFORM_APPLICATION_ARN = local.sns_platform_application_arn
+      DYNAMODB_TABLE_NAME         = aws_dynamodb_table.device_tokens.name
     }
   }
 
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
 }
 
+# Subscribe the dispatch Lambda to the dispatch topic
+resource "aws_sns_topic_subscription" "notification_dispatch" {
+  topic_arn = aws_sns_topic.notification_dispatch.arn
+  protocol  = "lambda"
+  endpoint  = aws_lambda_function.notification_dispatch_lambda.arn
+}
+
+# Lambda permission for the dispatch topic
+resource "aws_lambda_permission" "sns_dispatch" {
+  statement_id  = "AllowExecutionFromSNSDispatch"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.notification_dispatch_lambda.function_name
+  principal     = "sns.amazonaws.com"
+  source_arn    = aws_sns_topic.notification_dispatch.arn
+}
+
 # Create ZIP file for Lambda deployment
 data "archive_file" "lambda_zip" {
   type        = "zip"
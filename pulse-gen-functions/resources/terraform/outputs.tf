@@ -28,6 +28,11 @@ output "sns_topic_arn" {
   value       = aws_sns_topic.pulse_notifications.arn
 }
 
+output "notification_dispatch_topic_arn" {
+  description = "ARN of the SNS topic for asynchronous notification dispatch"
+  value       = aws_sns_topic.notification_dispatch.arn
+}
+
 output "sns_platform_application_arn" {
   description = "ARN of the SNS platform application for iOS"
   value       = local.sns_platform_application_arn
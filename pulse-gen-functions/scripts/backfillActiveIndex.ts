@@ -0,0 +1,53 @@
+import { UpdateItemCommand, ConditionalCheckFailedException, paginateScan } from '@aws-sdk/client-dynamodb';
+import { dynamodbClient } from '../src/services/awsClients';
+
+/**
+ * One-off backfill for the active-index GSI
+ * Devices registered before is_active was introduced are missing from the sparse index,
+ * so "send to all" and device listing skip them until this has been run once.
+ */
+async function backfillActiveIndex(): Promise<void> {
+  const tableName = process.env.DYNAMODB_TABLE_NAME;
+  if (!tableName) {
+    throw new Error('DYNAMODB_TABLE_NAME environment variable not set');
+  }
+
+  const paginator = paginateScan({ client: dynamodbClient }, {
+    TableName: tableName,
+    ProjectionExpression: 'device_id',
+    FilterExpression: 'attribute_not_exists(is_active)'
+  });
+
+  let updated = 0;
+  for await (const page of paginator) {
+    for (const item of page.Items || []) {
+      if (!item.device_id) {
+        continue;
+      }
+
+      try {
+        await dynamodbClient.send(new UpdateItemCommand({
+          TableName: tableName,
+          Key: { device_id: item.device_id },
+          UpdateExpression: 'SET is_active = :is_active',
+          // Skip devices deleted since the scan read them
+          ConditionExpression: 'attribute_exists(device_id)',
+          ExpressionAttributeValues: { ':is_active': { N: '1' } },
+          ReturnValues: 'NONE'
+        }));
+        updated++;
+      } catch (error) {
+        if (!(error instanceof ConditionalCheckFailedException)) {
+          throw error;
+        }
+      }
+    }
+  }
+
+  console.log(`Backfilled is_active on ${updated} devices in ${tableName}`);
+}
+
+backfillActiveIndex().catch(error => {
+  console.error('Failed to backfill active-index:', error);
+  process.exit(1);
+});
@@ -0,0 +1,58 @@
+import { SQSEvent, SQSBatchResponse, SQSBatchItemFailure, Context } from 'aws-lambda';
+import { notificationService, DeviceRegistrationRequest } from '../services/notificationService';
+import { ValidationUtils } from '../utils/validation';
+import { awaitClientWarmUp } from '../services/awsClients';
+
+/**
+ * Register devices delivered in an SQS batch
+ * Each record body is a device registration request. Failed records are reported
+ * back to SQS so only those messages are retried; this requires the event source
+ * mapping to enable ReportBatchItemFailures.
+ */
+export const deviceRegistrationQueueHandler = async (
+  event: SQSEvent,
+  context: Context
+): Promise<SQSBatchResponse> => {
+  await awaitClientWarmUp();
+
+  console.log(`Device registration queue handler called with ${event.Records.length} records`);
+
+  const batchItemFailures: SQSBatchItemFailure[] = [];
+  const requests: DeviceRegistrationRequest[] = [];
+  const messageIds: string[] = [];
+
+  for (const record of event.Records) {
+    let body: any;
+    try {
+      body = ValidationUtils.normalizeKeys(JSON.parse(record.body));
+    } catch (error) {
+      console.error(`Invalid JSON in record ${record.messageId}:`, error);
+      batchItemFailures.push({ itemIdentifier: record.messageId });
+      continue;
+    }
+
+    // Validate input
+    const validation = ValidationUtils.validateDeviceRegistrationRequest(body);
+    if (!validation.isValid) {
+      console.error(`Validation failed for record ${record.messageId}: ${validation.errors.join(', ')}`);
+      batchItemFailures.push({ itemIdentifier: record.messageId });
+      continue;
+    }
+
+    requests.push(ValidationUtils.sanitizeDeviceRegistrationRequest(body));
+    messageIds.push(record.messageId);
+  }
+
+  const results = await notificationService.registerDevices(requests);
+
+  results.forEach((result, index) => {
+    if (result.superseded) {
+      console.warn(`Record ${messageIds[index]} was superseded by a later registration for device ${result.device_id}`);
+    } else if (!result.success) {
+      console.error(`Registration failed for record ${messageIds[index]}: ${result.error}`);
+      batchItemFailures.push({ itemIdentifier: messageIds[index] });
+    }
+  });
+
+  return { batchItemFailures };
+};
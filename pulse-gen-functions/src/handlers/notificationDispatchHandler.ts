@@ -0,0 +1,32 @@
+import { SNSEvent, Context } from 'aws-lambda';
+import { notificationService, NotificationDispatchMessage } from '../services/notificationService';
+import { awaitClientWarmUp } from '../services/awsClients';
+
+/**
+ * Deliver notifications handed off by asynchronous sends
+ * Each SNS record carries a title, message and a slice of resolved device targets.
+ */
+export const notificationDispatchHandler = async (
+  event: SNSEvent,
+  context: Context
+): Promise<void> => {
+  await awaitClientWarmUp();
+
+  for (const record of event.Records) {
+    let dispatchMessage: NotificationDispatchMessage;
+    try {
+      dispatchMessage = JSON.parse(record.Sns.Message);
+    } catch (error) {
+      console.error(`Invalid dispatch message ${record.Sns.MessageId}:`, error);
+      continue;
+    }
+
+    const result = await notificationService.deliverNotification(
+      dispatchMessage.title,
+      dispatchMessage.message,
+      dispatchMessage.targets || []
+    );
+
+    console.log(`Dispatch ${record.Sns.MessageId}: ${result.successful} sent, ${result.failed} failed`);
+  }
+};
@@ -3,14 +3,22 @@ import { NotificationSubRoute } from '../types/routes';
 import { notificationService } from '../services/notificationService';
 import { ValidationUtils, ValidationResult } from '../utils/validation';
 
+// Response headers for notification routes, which allow fewer methods than the shared RESPONSE_HEADERS
+const NOTIFICATION_RESPONSE_HEADERS = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*',
+  'Access-Control-Allow-Methods': 'POST, GET, DELETE, OPTIONS',
+  'Access-Control-Allow-Headers': 'Content-Type'
+};
+
 export const notificationHandler = async (
   event: APIGatewayProxyEvent,
   context: Context,
   subRoute?: NotificationSubRoute
 ): Promise<APIGatewayProxyResult> => {
   try {
-    console.log('Notification handler called with event:', JSON.stringify(event, null, 2));
-    console.log('Sub-route:', subRoute);
+    // The full event is already logged by the main handler
+    console.log('Notification handler called with sub-route:', subRoute);
 
     // Route to appropriate sub-handler based on sub-route
     switch (subRoute) {
@@ -48,6 +56,9 @@ async function handleSendNotification(event: APIGatewayProxyEvent, context: Cont
     body = event as any;
   }
 
+  // Accept camelCase keys by normalizing them to snake_case once
+  body = ValidationUtils.normalizeKeys(body);
+
   // Validate input
   const validation = ValidationUtils.validateNotificationRequest(body);
   if (!validation.isValid) {
@@ -57,18 +68,44 @@ async function handleSendNotification(event: APIGatewayProxyEvent, context: Cont
   // Sanitize input
   const sanitizedRequest = ValidationUtils.sanitizeNotificationRequest(body);
 
+  // Hand off to the dispatch worker when the caller doesn't need per-device results
+  if (sanitizedRequest.async && notificationService.isAsyncDispatchEnabled()) {
+    const dispatchResult = await notificationService.dispatchNotifications(sanitizedRequest);
+
+    // Nothing was handed off, so the caller can safely retry
+    if (!dispatchResult.success) {
+      return createErrorResponse(500, 'Dispatch failed', dispatchResult.error || 'Unknown error');
+    }
+
+    if (dispatchResult.accepted === 0) {
+      return createErrorResponse(404, 'No device tokens found', 'No registered devices found for the specified criteria');
+    }
+
+    return createSuccessResponse(202, {
+      message: 'Notifications accepted',
+      accepted: dispatchResult.accepted,
+      failed: dispatchResult.failed
+    });
+  }
+
   // Call notification service
   const result = await notificationService.sendNotifications(sanitizedRequest);
 
   if (result.total_devices === 0) {
+    // A failed lookup is not the same as having no devices
+    if (result.truncated) {
+      return createErrorResponse(500, 'Failed to load device tokens', result.error || 'Unknown error');
+    }
     return createErrorResponse(404, 'No device tokens found', 'No registered devices found for the specified criteria');
   }
 
   const responseBody = {
-    message: 'Notifications sent',
+    message: result.truncated ? 'Notifications partially sent' : 'Notifications sent',
     total_devices: result.total_devices,
     successful: result.successful,
     failed: result.failed,
+    truncated: result.truncated,
+    error: result.error,
     results: result.results
   };
 
@@ -84,6 +121,9 @@ async function handleRegisterDevice(event: APIGatewayProxyEvent, context: Contex
     body = event as any;
   }
 
+  // Accept camelCase keys by normalizing them to snake_case once
+  body = ValidationUtils.normalizeKeys(body);
+
   // Validate input
   const validation = ValidationUtils.validateDeviceRegistrationRequest(body);
   if (!validation.isValid) {
@@ -110,7 +150,7 @@ async function handleRegisterDevice(event: APIGatewayProxyEvent, context: Contex
 }
 
 async function handleListDevices(event: APIGatewayProxyEvent, context: Context): Promise<APIGatewayProxyResult> {
-  const user_id = event.queryStringParameters?.user_id || event.queryStringParameters?.userId;
+  const user_id = ValidationUtils.normalizeKeys(event.queryStringParameters || {}).user_id;
 
   // Validate input
   const validation = ValidationUtils.validateUserId(user_id);
@@ -162,12 +202,7 @@ async function handleDeleteDevice(event: APIGatewayProxyEvent, context: Context)
 function createSuccessResponse(statusCode: number, body: any): APIGatewayProxyResult {
   return {
     statusCode,
-    headers: {
-      'Content-Type': 'application/json',
-      'Access-Control-Allow-Origin': '*',
-      'Access-Control-Allow-Methods': 'POST, GET, DELETE, OPTIONS',
-      'Access-Control-Allow-Headers': 'Content-Type'
-    },
+    headers: NOTIFICATION_RESPONSE_HEADERS,
     body: JSON.stringify(body)
   };
 }
@@ -175,12 +210,7 @@ function createSuccessResponse(statusCode: number, body: any): APIGatewayProxyRe
 function createErrorResponse(statusCode: number, error: string, message: string): APIGatewayProxyResult {
   return {
     statusCode,
-    headers: {
-      'Content-Type': 'application/json',
-      'Access-Control-Allow-Origin': '*',
-      'Access-Control-Allow-Methods': 'POST, GET, DELETE, OPTIONS',
-      'Access-Control-Allow-Headers': 'Content-Type'
-    },
+    headers: NOTIFICATION_RESPONSE_HEADERS,
     body: JSON.stringify({
       error,
       message
@@ -1,4 +1,5 @@
 import { APIGatewayProxyEvent, APIGatewayProxyResult, Context } from 'aws-lambda';
+import { RESPONSE_HEADERS } from '../utils/responseHeaders';
 
 // Test schedule events data
 const testScheduleEvents = [
@@ -115,12 +116,7 @@ export const scheduleHandler = async (
 
   return {
     statusCode: 200,
-    headers: {
-      'Content-Type': 'application/json',
-      'Access-Control-Allow-Origin': '*',
-      'Access-Control-Allow-Headers': 'Content-Type',
-      'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-    },
+    headers: RESPONSE_HEADERS,
     body: JSON.stringify({
       message: 'Schedule handler response',
       data: {
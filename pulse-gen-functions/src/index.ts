@@ -4,14 +4,21 @@ import { scheduleHandler } from './handlers/scheduleHandler';
 import { notificationHandler } from './handlers/notificationHandler';
 import { parseRoute } from './utils/routeParser';
 import { PulseGenFunctionRoute } from './types/routes';
+import { awaitClientWarmUp } from './services/awsClients';
+import { RESPONSE_HEADERS } from './utils/responseHeaders';
+
+export { deviceRegistrationQueueHandler } from './handlers/deviceRegistrationQueueHandler';
+export { notificationDispatchHandler } from './handlers/notificationDispatchHandler';
 
 export const handler = async (
   event: APIGatewayProxyEvent,
   context: Context
 ): Promise<APIGatewayProxyResult> => {
   try {
-    console.log('Event:', JSON.stringify(event, null, 2));
-    console.log('Context:', JSON.stringify(context, null, 2));
+    await awaitClientWarmUp();
+
+    console.log('Event:', JSON.stringify(event));
+    console.log('Context:', JSON.stringify(context));
 
     const { httpMethod, path } = event;
     const pathSegments = path.split('/').filter(Boolean);
@@ -38,12 +45,7 @@ export const handler = async (
     // Default response for unknown routes
     return {
       statusCode: 404,
-      headers: {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-      },
+      headers: RESPONSE_HEADERS,
       body: JSON.stringify({
         message: 'Route not found',
         path: path,
@@ -56,12 +58,7 @@ export const handler = async (
     
     return {
       statusCode: 500,
-      headers: {
-        'Content-Type': 'application/json',
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type',
-        'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
-      },
+      headers: RESPONSE_HEADERS,
       body: JSON.stringify({
         message: 'Internal server error',
         error: error instanceof Error ? error.message : 'Unknown error'
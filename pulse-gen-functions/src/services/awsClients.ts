@@ -0,0 +1,54 @@
+import { Agent } from 'https';
+import { SNSClient } from '@aws-sdk/client-sns';
+import { DynamoDBClient, DescribeTableCommand } from '@aws-sdk/client-dynamodb';
+
+// Shared client configuration
+// Clients are created once per container and reused across warm invocations.
+// The socket pool is sized above the publish concurrency so parallel sends don't queue,
+// and the short timeouts let the adaptive retry strategy recover from a stalled connection.
+const clientConfig = {
+  region: process.env.AWS_REGION || 'us-east-1',
+  maxAttempts: 3,
+  retryMode: 'adaptive' as const,
+  requestHandler: {
+    httpsAgent: new Agent({ keepAlive: true, maxSockets: 64 }),
+    connectionTimeout: 1000,
+    requestTimeout: 3000
+  }
+};
+
+export const snsClient = new SNSClient(clientConfig);
+
+export const dynamodbClient = new DynamoDBClient(clientConfig);
+
+/**
+ * Resolve credentials and open connections ahead of the first request
+ */
+async function warmUpClients(): Promise<void> {
+  const tableName = process.env.DYNAMODB_TABLE_NAME;
+
+  await Promise.all([
+    snsClient.config.credentials(),
+    tableName
+      ? dynamodbClient.send(new DescribeTableCommand({ TableName: tableName }))
+      : dynamodbClient.config.credentials()
+  ]);
+}
+
+// Provisioned concurrency and SnapStart environments are initialized before traffic arrives,
+// so the warm-up is started during init. Lambda may freeze the sandbox before it settles,
+// so entry points await it before making their own calls.
+const initializationType = process.env.AWS_LAMBDA_INITIALIZATION_TYPE;
+const clientWarmUp: Promise<void> = initializationType && initializationType !== 'on-demand'
+  ? warmUpClients().catch(error => {
+    console.warn('Failed to warm up AWS clients:', error);
+  })
+  : Promise.resolve();
+
+/**
+ * Wait for the init-phase warm-up, if one was started
+ * Resolves immediately once it has settled, and never rejects
+ */
+export function awaitClientWarmUp(): Promise<void> {
+  return clientWarmUp;
+}
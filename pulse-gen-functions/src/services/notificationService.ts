@@ -1,11 +1,28 @@
-import { DynamoDBClient, GetItemCommand, QueryCommand, ScanCommand, PutItemCommand, DeleteItemCommand } from '@aws-sdk/client-dynamodb';
+import { GetItemCommand, QueryCommandInput, PutItemCommand, UpdateItemCommand, DeleteItemCommand, ConditionalCheckFailedException, BatchWriteItemCommand, BatchGetItemCommand, WriteRequest, AttributeValue, paginateQuery } from '@aws-sdk/client-dynamodb';
 import { marshall, unmarshall } from '@aws-sdk/util-dynamodb';
 import { snsService, SNSNotificationPayload } from './snsService';
+import { dynamodbClient } from './awsClients';
+import { mapWithConcurrency } from '../utils/concurrency';
+import { logPerDevice } from '../utils/logging';
 
-// Initialize DynamoDB client
-const dynamodbClient = new DynamoDBClient({ 
-  region: process.env.AWS_REGION || 'us-east-1' 
-});
+// Maximum number of SNS requests in flight during a fan-out
+const PUBLISH_CONCURRENCY = parseInt(process.env.SNS_PUBLISH_CONCURRENCY || '32', 10) || 32;
+
+// Attributes needed to publish to a registered device
+const SEND_TARGET_PROJECTION = 'device_id, endpoint_arn';
+
+// Targets carried by each asynchronous dispatch message, kept well under the SNS batch size limit
+const DISPATCH_TARGETS_PER_MESSAGE = 50;
+
+// Attributes refreshed when an already registered device registers again; created_at is kept
+const REREGISTER_FIELDS = ['user_id', 'device_token', 'endpoint_arn', 'bundle_id', 'platform', 'last_updated', 'active', 'is_active'] as const;
+const REREGISTER_UPDATE_EXPRESSION = 'SET ' + REREGISTER_FIELDS.map(field => `#${field} = :${field}`).join(', ');
+const REREGISTER_ATTRIBUTE_NAMES = Object.fromEntries(REREGISTER_FIELDS.map(field => [`#${field}`, field]));
+
+// BatchWriteItem accepts at most 25 put requests per call, BatchGetItem at most 100 keys
+const BATCH_WRITE_SIZE = 25;
+const BATCH_GET_SIZE = 100;
+const BATCH_MAX_ATTEMPTS = 5;
 
 // Notification Service interfaces
 export interface DeviceToken {
@@ -18,28 +35,50 @@ export interface DeviceToken {
   created_at?: string;
   last_updated?: string;
   active?: boolean;
+  is_active?: number;
 }
 
 export interface NotificationRequest {
   message?: string;
   title?: string;
   user_id?: string;
-  userId?: string;
   device_id?: string;
-  deviceId?: string;
   device_token?: string;
-  deviceToken?: string;
+  async?: boolean;
+}
+
+// Devices to notify, either already loaded or streamed page by page from DynamoDB
+export type DeviceTokenSource = Iterable<DeviceToken> | AsyncIterable<DeviceToken>;
+
+export interface NotificationDeliveryResult {
+  total_devices: number;
+  successful: number;
+  failed: number;
+  results: NotificationResult[];
+  // Set when the device lookup failed partway, so later devices were not sent to
+  truncated?: boolean;
+  error?: string;
+}
+
+export interface NotificationDispatchMessage {
+  title: string;
+  message: string;
+  targets: DeviceToken[];
+}
+
+export interface NotificationDispatchResult {
+  // False only when devices were found but none could be handed off
+  success: boolean;
+  accepted: number;
+  failed: number;
+  error?: string;
 }
 
 export interface DeviceRegistrationRequest {
   device_token?: string;
-  deviceToken?: string;
   user_id?: string;
-  userId?: string;
   device_id?: string;
-  deviceId?: string;
   bundle_id?: string;
-  bundleId?: string;
   platform?: string;
   timestamp?: string;
 }
@@ -57,6 +96,8 @@ export interface DeviceRegistrationResult {
   success: boolean;
   device_id?: string;
   endpoint_arn?: string;
+  // Set when a later request in the same batch registered the same device_id
+  superseded?: boolean;
   error?: string;
 }
 
@@ -74,66 +115,123 @@ export interface DeviceListResult {
 }
 
 export class NotificationService {
-  private tableName: string;
+  private readonly tableName: string;
+  private readonly dispatchTopicArn: string;
+  // Query inputs that only depend on configuration, built once per container
+  private readonly userDevicesQuery: QueryCommandInput;
+  private readonly activeDevicesQuery: QueryCommandInput;
 
   constructor() {
     this.tableName = process.env.DYNAMODB_TABLE_NAME || '';
     if (!this.tableName) {
       console.error('DYNAMODB_TABLE_NAME environment variable not set');
     }
+    this.dispatchTopicArn = process.env.ASYNC_DISPATCH_TOPIC_ARN || '';
+
+    this.userDevicesQuery = {
+      TableName: this.tableName,
+      IndexName: 'user-id-index',
+      KeyConditionExpression: 'user_id = :user_id'
+    };
+
+    // Active devices share a constant partition in a sparse index, so a paginated
+    // query reads every page without scanning the whole table
+    this.activeDevicesQuery = {
+      TableName: this.tableName,
+      IndexName: 'active-index',
+      KeyConditionExpression: 'is_active = :is_active',
+      ExpressionAttributeValues: { ':is_active': { N: '1' } }
+    };
+  }
+
+  /**
+   * Whether notifications can be handed off for asynchronous delivery
+   */
+  isAsyncDispatchEnabled(): boolean {
+    return !!this.dispatchTopicArn;
   }
 
   /**
    * Send notifications based on request criteria
    */
-  async sendNotifications(request: NotificationRequest): Promise<{
-    total_devices: number;
-    successful: number;
-    failed: number;
-    results: NotificationResult[];
-  }> {
-    // Extract notification details - support both formats
+  async sendNotifications(request: NotificationRequest): Promise<NotificationDeliveryResult> {
+    // Extract notification details
     const message = request.message || 'Hello from Pulse!';
     const title = request.title || 'Pulse Notification';
-    const user_id = request.user_id || request.userId;
-    const device_id = request.device_id || request.deviceId;
-    const device_token = request.device_token || request.deviceToken;
 
     console.log(`Sending notification: ${title} - ${message}`);
 
-    // Get device tokens to send to
-    let deviceTokens: DeviceToken[] = [];
+    const deviceTokens = await this.resolveDeviceTokens(request);
 
-    if (device_token) {
-      // Direct device token provided - create temporary endpoint for testing
-      deviceTokens = [{ 
-        device_id: 'direct-token', 
-        user_id: 'direct', 
-        device_token, 
-        endpoint_arn: '' 
-      }];
-    } else if (device_id) {
-      // Send to specific device
-      deviceTokens = await this.getDeviceToken(device_id);
-    } else if (user_id) {
-      // Send to all devices for a user
-      deviceTokens = await this.getUserDeviceTokens(user_id);
-    } else {
-      // Send to all registered devices (for testing)
-      deviceTokens = await this.getAllDeviceTokens();
+    return this.deliverNotification(title, message, deviceTokens);
+  }
+
+  /**
+   * Hand notifications off to the dispatch topic without waiting for delivery
+   * Targets are resolved here and delivered by the dispatch worker. Nothing is
+   * published unless every target could be loaded.
+   */
+  async dispatchNotifications(request: NotificationRequest): Promise<NotificationDispatchResult> {
+    // Extract notification details
+    const message = request.message || 'Hello from Pulse!';
+    const title = request.title || 'Pulse Notification';
+
+    console.log(`Dispatching notification: ${title} - ${message}`);
+
+    const deviceTokens: DeviceToken[] = [];
+    try {
+      for await (const tokenInfo of await this.resolveDeviceTokens(request)) {
+        deviceTokens.push(tokenInfo);
+      }
+    } catch (error) {
+      return {
+        success: false,
+        accepted: 0,
+        failed: 0,
+        error: `Could not load device tokens: ${error instanceof Error ? error.message : 'Unknown error'}`
+      };
     }
 
     if (deviceTokens.length === 0) {
       return {
-        total_devices: 0,
-        successful: 0,
-        failed: 0,
-        results: []
+        success: true,
+        accepted: 0,
+        failed: 0
+      };
+    }
+
+    const dispatchMessages: string[] = [];
+    const targetCounts: number[] = [];
+    for (let i = 0; i < deviceTokens.length; i += DISPATCH_TARGETS_PER_MESSAGE) {
+      const dispatchMessage: NotificationDispatchMessage = {
+        title,
+        message,
+        targets: deviceTokens.slice(i, i + DISPATCH_TARGETS_PER_MESSAGE)
       };
+      dispatchMessages.push(JSON.stringify(dispatchMessage));
+      targetCounts.push(dispatchMessage.targets.length);
     }
 
+    const result = await snsService.publishBatchToTopic(this.dispatchTopicArn, dispatchMessages);
+
+    // Published slices will be delivered by the worker even if others failed
+    const accepted = result.publishedIndexes.reduce((total, index) => total + targetCounts[index], 0);
+
+    return {
+      success: accepted > 0,
+      accepted,
+      failed: deviceTokens.length - accepted,
+      error: result.error
+    };
+  }
+
+  /**
+   * Deliver a notification to resolved devices
+   * When devices are streamed, sends start while later query pages are still loading.
+   * If a page fails to load, devices already read are still sent and the result is marked truncated.
+   */
+  async deliverNotification(title: string, message: string, deviceTokens: DeviceTokenSource): Promise<NotificationDeliveryResult> {
     // Send notifications
-    const results: NotificationResult[] = [];
     const payload: SNSNotificationPayload = {
       title,
       message,
@@ -142,39 +240,35 @@ export class NotificationService {
       }
     };
 
-    for (const tokenInfo of deviceTokens) {
-      if (tokenInfo.endpoint_arn) {
-        // Regular registered device
-        const result = await this.sendNotificationToDevice(
-          tokenInfo.endpoint_arn,
-          payload,
-          tokenInfo.device_id
-        );
-        results.push(result);
-      } else if (tokenInfo.device_token) {
-        // Direct device token - create temporary endpoint
-        const result = await this.sendNotificationToDirectToken(
-          tokenInfo.device_token,
-          payload,
-          tokenInfo.device_id
-        );
-        results.push(result);
-      } else {
-        results.push({
-          success: false,
-          error: 'Invalid token info format'
-        });
+    // Every device receives the same message, so serialize it once
+    const snsMessage = snsService.buildMessage(payload);
+
+    // Stop at a failed page instead of discarding the sends already in flight
+    let lookupError: string | undefined;
+    const targets = (async function* () {
+      try {
+        yield* deviceTokens;
+      } catch (error) {
+        lookupError = error instanceof Error ? error.message : 'Unknown error';
       }
-    }
+    })();
+
+    const results = await mapWithConcurrency(
+      targets,
+      PUBLISH_CONCURRENCY,
+      tokenInfo => this.sendNotificationToTarget(tokenInfo, snsMessage)
+    );
 
     const successfulSends = results.filter(r => r.success);
     const failedSends = results.filter(r => !r.success);
 
     return {
-      total_devices: deviceTokens.length,
+      total_devices: results.length,
       successful: successfulSends.length,
       failed: failedSends.length,
-      results
+      results,
+      truncated: lookupError !== undefined ? true : undefined,
+      error: lookupError !== undefined ? `Could not load all device tokens: ${lookupError}` : undefined
     };
   }
 
@@ -182,46 +276,17 @@ export class NotificationService {
    * Register a new device
    */
   async registerDevice(request: DeviceRegistrationRequest): Promise<DeviceRegistrationResult> {
-    // Extract registration details
-    const device_token = request.device_token || request.deviceToken;
-    const user_id = request.user_id || request.userId || 'anonymous';
-    const device_id = request.device_id || request.deviceId || this.generateUUID();
-    const bundle_id = request.bundle_id || request.bundleId;
-    const platform = request.platform || 'ios';
-    const timestamp = request.timestamp || new Date().toISOString();
-
-    if (!device_token) {
-      return {
-        success: false,
-        error: 'device_token is required'
-      };
-    }
-
-    console.log(`Registering device: ${device_id} for user: ${user_id}`);
+    const { device, error } = await this.createDeviceRecord(request);
 
-    // Create SNS platform endpoint
-    const endpointResult = await snsService.createPlatformEndpoint({
-      deviceToken: device_token,
-      customUserData: device_id
-    });
-
-    if (!endpointResult.success || !endpointResult.endpointArn) {
+    if (!device) {
       return {
         success: false,
-        error: endpointResult.error || 'Could not register device with SNS'
+        error
       };
     }
 
     // Store device information in DynamoDB
-    const storeResult = await this.storeDeviceToken(
-      device_id, 
-      user_id, 
-      device_token, 
-      endpointResult.endpointArn, 
-      bundle_id, 
-      platform, 
-      timestamp
-    );
+    const storeResult = await this.storeDeviceToken(device);
 
     if (!storeResult) {
       return {
@@ -232,23 +297,88 @@ export class NotificationService {
 
     return {
       success: true,
-      device_id: device_id,
-      endpoint_arn: endpointResult.endpointArn
+      device_id: device.device_id,
+      endpoint_arn: device.endpoint_arn
     };
   }
 
+  /**
+   * Register several devices, storing them with batched DynamoDB writes
+   * Results are returned in the same order as the requests
+   */
+  async registerDevices(requests: DeviceRegistrationRequest[]): Promise<DeviceRegistrationResult[]> {
+    // SNS endpoints are created concurrently; the records are then written together
+    const records = await mapWithConcurrency(
+      requests,
+      PUBLISH_CONCURRENCY,
+      request => this.createDeviceRecord(request)
+    );
+
+    // A batch may not contain the same key twice, so the last registration for a device wins
+    const latestRecordIndex = new Map<string, number>();
+    records.forEach(({ device }, index) => {
+      if (device) {
+        latestRecordIndex.set(device.device_id, index);
+      }
+    });
+
+    const devices = Array.from(latestRecordIndex.values()).map(index => records[index].device!);
+    const failedDeviceIds = await this.storeDeviceTokens(devices);
+
+    return records.map(({ device, error }, index) => {
+      if (!device) {
+        return {
+          success: false,
+          error
+        };
+      }
+
+      if (latestRecordIndex.get(device.device_id) !== index) {
+        // Not written; reported as handled so a queue retry can't overwrite the newer registration
+        return {
+          success: true,
+          device_id: device.device_id,
+          endpoint_arn: device.endpoint_arn,
+          superseded: true
+        };
+      }
+
+      if (failedDeviceIds.has(device.device_id)) {
+        return {
+          success: false,
+          device_id: device.device_id,
+          error: 'Could not save device information'
+        };
+      }
+
+      return {
+        success: true,
+        device_id: device.device_id,
+        endpoint_arn: device.endpoint_arn
+      };
+    });
+  }
+
   /**
    * List devices for a user or all devices
    */
   async listDevices(user_id?: string): Promise<DeviceListResult> {
-    let devices: DeviceToken[] = [];
+    const devices: DeviceToken[] = [];
 
-    if (user_id) {
-      // Get devices for specific user
-      devices = await this.getUserDeviceTokens(user_id);
-    } else {
-      // Get all devices (for admin purposes)
-      devices = await this.getAllDeviceTokens();
+    // Get devices for specific user, or all devices (for admin purposes)
+    const deviceTokens = user_id
+      ? this.getUserDeviceTokens(user_id)
+      : this.getAllDeviceTokens();
+
+    try {
+      for await (const device of deviceTokens) {
+        devices.push(device);
+      }
+    } catch (error) {
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Unknown error'
+      };
     }
 
     return {
@@ -284,12 +414,63 @@ export class NotificationService {
 
   // Private helper methods
 
+  private async resolveDeviceTokens(request: NotificationRequest): Promise<DeviceTokenSource> {
+    const { user_id, device_id, device_token } = request;
+
+    if (device_token) {
+      // Direct device token provided - create temporary endpoint for testing
+      return [{ 
+        device_id: 'direct-token', 
+        user_id: 'direct', 
+        device_token, 
+        endpoint_arn: '' 
+      }];
+    } else if (device_id) {
+      // Send to specific device
+      return this.getDeviceToken(device_id);
+    } else if (user_id) {
+      // Send to all devices for a user
+      return this.getUserDeviceTokens(user_id, true);
+    } else {
+      // Send to all registered devices (for testing)
+      return this.getAllDeviceTokens(true);
+    }
+  }
+
+  private async sendNotificationToTarget(
+    tokenInfo: DeviceToken,
+    snsMessage: string
+  ): Promise<NotificationResult> {
+    if (tokenInfo.endpoint_arn) {
+      // Regular registered device
+      return this.sendNotificationToDevice(
+        tokenInfo.endpoint_arn,
+        snsMessage,
+        tokenInfo.device_id
+      );
+    }
+
+    if (tokenInfo.device_token) {
+      // Direct device token - create temporary endpoint
+      return this.sendNotificationToDirectToken(
+        tokenInfo.device_token,
+        snsMessage,
+        tokenInfo.device_id
+      );
+    }
+
+    return {
+      success: false,
+      error: 'Invalid token info format'
+    };
+  }
+
   private async sendNotificationToDevice(
     endpointArn: string, 
-    payload: SNSNotificationPayload, 
+    snsMessage: string, 
     deviceId?: string
   ): Promise<NotificationResult> {
-    const result = await snsService.sendNotificationToEndpoint(endpointArn, payload);
+    const result = await snsService.sendNotificationToEndpoint(endpointArn, snsMessage);
     
     return {
       success: result.success,
@@ -302,10 +483,10 @@ export class NotificationService {
 
   private async sendNotificationToDirectToken(
     deviceToken: string, 
-    payload: SNSNotificationPayload, 
+    snsMessage: string, 
     deviceId?: string
   ): Promise<NotificationResult> {
-    const result = await snsService.sendNotificationToDirectToken(deviceToken, payload, deviceId);
+    const result = await snsService.sendNotificationToDirectToken(deviceToken, snsMessage, deviceId);
     
     return {
       success: result.success,
@@ -325,13 +506,14 @@ export class NotificationService {
 
       const command = new GetItemCommand({
         TableName: this.tableName,
-        Key: marshall({ device_id: deviceId })
+        Key: { device_id: { S: deviceId } },
+        ProjectionExpression: SEND_TARGET_PROJECTION
       });
 
       const response = await dynamodbClient.send(command);
       
       if (response.Item) {
-        return [unmarshall(response.Item) as DeviceToken];
+        return [this.toSendTarget(response.Item)];
       }
       return [];
     } catch (error) {
@@ -340,47 +522,55 @@ export class NotificationService {
     }
   }
 
-  private async getUserDeviceTokens(userId: string): Promise<DeviceToken[]> {
-    try {
-      if (!this.tableName) {
-        console.error('DYNAMODB_TABLE_NAME environment variable not set');
-        return [];
-      }
-
-      const command = new QueryCommand({
-        TableName: this.tableName,
-        IndexName: 'user-id-index',
-        KeyConditionExpression: 'user_id = :user_id',
-        ExpressionAttributeValues: marshall({ ':user_id': userId })
-      });
+  private getUserDeviceTokens(userId: string, sendTargetsOnly: boolean = false): AsyncGenerator<DeviceToken> {
+    return this.queryDeviceTokens({
+      ...this.userDevicesQuery,
+      ExpressionAttributeValues: { ':user_id': { S: userId } },
+      ProjectionExpression: sendTargetsOnly ? SEND_TARGET_PROJECTION : undefined
+    }, sendTargetsOnly);
+  }
 
-      const response = await dynamodbClient.send(command);
-      return (response.Items || []).map(item => unmarshall(item) as DeviceToken);
-    } catch (error) {
-      console.error('Error getting user device tokens:', error);
-      return [];
-    }
+  private getAllDeviceTokens(sendTargetsOnly: boolean = false): AsyncGenerator<DeviceToken> {
+    return this.queryDeviceTokens({
+      ...this.activeDevicesQuery,
+      ProjectionExpression: sendTargetsOnly ? SEND_TARGET_PROJECTION : undefined
+    }, sendTargetsOnly);
   }
 
-  private async getAllDeviceTokens(): Promise<DeviceToken[]> {
+  /**
+   * Yield the devices matched by a query, one page at a time
+   * A failed page is rethrown so callers don't mistake a partial result for the full set
+   */
+  private async *queryDeviceTokens(input: QueryCommandInput, sendTargetsOnly: boolean): AsyncGenerator<DeviceToken> {
     try {
       if (!this.tableName) {
         console.error('DYNAMODB_TABLE_NAME environment variable not set');
-        return [];
+        return;
       }
 
-      const command = new ScanCommand({
-        TableName: this.tableName
-      });
+      const paginator = paginateQuery({ client: dynamodbClient }, input);
 
-      const response = await dynamodbClient.send(command);
-      return (response.Items || []).map(item => unmarshall(item) as DeviceToken);
+      for await (const page of paginator) {
+        for (const item of page.Items || []) {
+          yield sendTargetsOnly ? this.toSendTarget(item) : unmarshall(item) as DeviceToken;
+        }
+      }
     } catch (error) {
-      console.error('Error getting all device tokens:', error);
-      return [];
+      console.error(`Error querying device tokens from ${input.IndexName}:`, error);
+      throw error;
     }
   }
 
+  /**
+   * Read a projected send target straight from its attribute values
+   */
+  private toSendTarget(item: Record<string, AttributeValue>): DeviceToken {
+    return {
+      device_id: item.device_id?.S,
+      endpoint_arn: item.endpoint_arn?.S
+    } as DeviceToken;
+  }
+
   private async deleteDeviceToken(deviceId: string): Promise<boolean> {
     try {
       if (!this.tableName) {
@@ -390,7 +580,7 @@ export class NotificationService {
 
       const command = new DeleteItemCommand({
         TableName: this.tableName,
-        Key: marshall({ device_id: deviceId })
+        Key: { device_id: { S: deviceId } }
       });
 
       await dynamodbClient.send(command);
@@ -402,15 +592,59 @@ export class NotificationService {
     }
   }
 
-  private async storeDeviceToken(
-    deviceId: string, 
-    userId: string, 
-    deviceToken: string, 
-    endpointArn: string, 
-    bundleId?: string, 
-    platform: string = 'ios', 
-    timestamp?: string
-  ): Promise<boolean> {
+  /**
+   * Create the SNS endpoint for a registration request and build its device record
+   */
+  private async createDeviceRecord(request: DeviceRegistrationRequest): Promise<{ device?: DeviceToken; error?: string }> {
+    // Extract registration details
+    const device_token = request.device_token;
+    const user_id = request.user_id || 'anonymous';
+    const device_id = request.device_id || this.generateUUID();
+    const bundle_id = request.bundle_id;
+    const platform = request.platform || 'ios';
+    const now = new Date().toISOString();
+    const timestamp = request.timestamp || now;
+
+    if (!device_token) {
+      return {
+        error: 'device_token is required'
+      };
+    }
+
+    if (logPerDevice) {
+      console.log('Registering device: %s for user: %s', device_id, user_id);
+    }
+
+    // Create SNS platform endpoint
+    const endpointResult = await snsService.createPlatformEndpoint({
+      deviceToken: device_token,
+      customUserData: device_id,
+      takeOver: true
+    });
+
+    if (!endpointResult.success || !endpointResult.endpointArn) {
+      return {
+        error: endpointResult.error || 'Could not register device with SNS'
+      };
+    }
+
+    return {
+      device: {
+        device_id,
+        user_id,
+        device_token,
+        endpoint_arn: endpointResult.endpointArn,
+        bundle_id: bundle_id || 'unknown',
+        platform,
+        created_at: timestamp,
+        last_updated: now,
+        active: true,
+        is_active: 1
+      }
+    };
+  }
+
+  private async storeDeviceToken(device: DeviceToken): Promise<boolean> {
     try {
       if (!this.tableName) {
         console.error('DYNAMODB_TABLE_NAME environment variable not set');
@@ -419,22 +653,40 @@ export class NotificationService {
 
       const command = new PutItemCommand({
         TableName: this.tableName,
-        Item: marshall({
-          device_id: deviceId,
-          user_id: userId,
-          device_token: deviceToken,
-          endpoint_arn: endpointArn,
-          bundle_id: bundleId || 'unknown',
-          platform: platform,
-          created_at: timestamp || new Date().toISOString(),
-          last_updated: new Date().toISOString(),
-          active: true
-        })
+        Item: marshall(device),
+        ConditionExpression: 'attribute_not_exists(device_id)',
+        ReturnValues: 'NONE'
       });
 
-      await dynamodbClient.send(command);
-      
-      console.log(`Stored device token for device: ${deviceId}`);
+      try {
+        await dynamodbClient.send(command);
+        if (logPerDevice) {
+          console.log('Stored device token for device: %s', device.device_id);
+        }
+        return true;
+      } catch (error) {
+        if (!(error instanceof ConditionalCheckFailedException)) {
+          throw error;
+        }
+      }
+
+      // Device is already registered - refresh it without overwriting created_at
+      const updateCommand = new UpdateItemCommand({
+        TableName: this.tableName,
+        Key: { device_id: { S: device.device_id } },
+        UpdateExpression: REREGISTER_UPDATE_EXPRESSION,
+        ExpressionAttributeNames: REREGISTER_ATTRIBUTE_NAMES,
+        ExpressionAttributeValues: marshall(
+          Object.fromEntries(REREGISTER_FIELDS.map(field => [`:${field}`, device[field]]))
+        ),
+        ReturnValues: 'NONE'
+      });
+
+      await dynamodbClient.send(updateCommand);
+
+      if (logPerDevice) {
+        console.log('Updated device token for device: %s', device.device_id);
+      }
       return true;
 
     } catch (error) {
@@ -443,6 +695,127 @@ export class NotificationService {
     }
   }
 
+  /**
+   * Store device records, one record per device_id
+   * New devices are written with BatchWriteItem; devices that already exist go through
+   * storeDeviceToken so re-registration keeps created_at. BatchWriteItem can't be
+   * conditional, so a device registered elsewhere between the existence check and the
+   * batch write is overwritten, created_at included.
+   * Returns the IDs of devices that could not be stored
+   */
+  private async storeDeviceTokens(devices: DeviceToken[]): Promise<Set<string>> {
+    const failedDeviceIds = new Set<string>();
+
+    if (!this.tableName) {
+      console.error('DYNAMODB_TABLE_NAME environment variable not set');
+      devices.forEach(device => failedDeviceIds.add(device.device_id));
+      return failedDeviceIds;
+    }
+
+    // If existence can't be determined, every device takes the conditional path
+    const existingDeviceIds = await this.findExistingDeviceIds(devices.map(device => device.device_id));
+    const newDevices = existingDeviceIds
+      ? devices.filter(device => !existingDeviceIds.has(device.device_id))
+      : [];
+    const knownDevices = existingDeviceIds
+      ? devices.filter(device => existingDeviceIds.has(device.device_id))
+      : devices;
+
+    const knownResults = await mapWithConcurrency(
+      knownDevices,
+      PUBLISH_CONCURRENCY,
+      device => this.storeDeviceToken(device)
+    );
+    knownDevices.forEach((device, index) => {
+      if (!knownResults[index]) {
+        failedDeviceIds.add(device.device_id);
+      }
+    });
+
+    for (let i = 0; i < newDevices.length; i += BATCH_WRITE_SIZE) {
+      const chunk = newDevices.slice(i, i + BATCH_WRITE_SIZE);
+      let pending: WriteRequest[] = chunk.map(device => ({
+        PutRequest: { Item: marshall(device) }
+      }));
+
+      try {
+        for (let attempt = 1; pending.length > 0 && attempt <= BATCH_MAX_ATTEMPTS; attempt++) {
+          if (attempt > 1) {
+            // Back off before retrying items DynamoDB throttled
+            await new Promise(resolve => setTimeout(resolve, 50 * 2 ** attempt));
+          }
+
+          const response = await dynamodbClient.send(new BatchWriteItemCommand({
+            RequestItems: { [this.tableName]: pending }
+          }));
+
+          pending = response.UnprocessedItems?.[this.tableName] || [];
+        }
+      } catch (error) {
+        console.error('Failed to batch store device tokens:', error);
+      }
+
+      for (const request of pending) {
+        const item = request.PutRequest?.Item;
+        if (item) {
+          failedDeviceIds.add(unmarshall(item).device_id);
+        }
+      }
+
+      console.log(`Stored ${chunk.length - pending.length} of ${chunk.length} device tokens`);
+    }
+
+    return failedDeviceIds;
+  }
+
+  /**
+   * Look up which device IDs already have a record
+   * Returns null if the lookup fails
+   */
+  private async findExistingDeviceIds(deviceIds: string[]): Promise<Set<string> | null> {
+    const existingDeviceIds = new Set<string>();
+
+    try {
+      for (let i = 0; i < deviceIds.length; i += BATCH_GET_SIZE) {
+        let pendingKeys: Record<string, AttributeValue>[] = deviceIds
+          .slice(i, i + BATCH_GET_SIZE)
+          .map(deviceId => ({ device_id: { S: deviceId } }));
+
+        for (let attempt = 1; pendingKeys.length > 0; attempt++) {
+          if (attempt > BATCH_MAX_ATTEMPTS) {
+            return null;
+          }
+          if (attempt > 1) {
+            // Back off before retrying keys DynamoDB throttled
+            await new Promise(resolve => setTimeout(resolve, 50 * 2 ** attempt));
+          }
+
+          const response = await dynamodbClient.send(new BatchGetItemCommand({
+            RequestItems: {
+              [this.tableName]: {
+                Keys: pendingKeys,
+                ProjectionExpression: 'device_id'
+              }
+            }
+          }));
+
+          for (const item of response.Responses?.[this.tableName] || []) {
+            if (item.device_id?.S) {
+              existingDeviceIds.add(item.device_id.S);
+            }
+          }
+
+          pendingKeys = response.UnprocessedKeys?.[this.tableName]?.Keys || [];
+        }
+      }
+    } catch (error) {
+      console.error('Failed to look up existing devices:', error);
+      return null;
+    }
+
+    return existingDeviceIds;
+  }
+
   private generateUUID(): string {
     return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
       const r = Math.random() * 16 | 0;
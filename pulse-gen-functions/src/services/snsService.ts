@@ -1,9 +1,17 @@
-import { SNSClient, PublishCommand, CreatePlatformEndpointCommand, DeleteEndpointCommand, SetEndpointAttributesCommand } from '@aws-sdk/client-sns';
+import { createHash } from 'crypto';
+import { PublishCommand, PublishBatchCommand, CreatePlatformEndpointCommand, DeleteEndpointCommand, SetEndpointAttributesCommand } from '@aws-sdk/client-sns';
+import { snsClient } from './awsClients';
+import { logPerDevice } from '../utils/logging';
 
-// Initialize SNS client
-const snsClient = new SNSClient({ 
-  region: process.env.AWS_REGION || 'us-east-1' 
-});
+// PublishBatch accepts at most 10 messages per call
+const PUBLISH_BATCH_SIZE = 10;
+
+// Maximum number of direct-token endpoints remembered per container
+const DIRECT_ENDPOINT_CACHE_SIZE = 4096;
+
+// CreatePlatformEndpoint error for a token that already has an endpoint with other attributes, e.g.
+// "Invalid parameter: Token Reason: Endpoint arn:aws:sns:... already exists with the same Token, but different attributes."
+const EXISTING_ENDPOINT_PATTERN = /Endpoint (arn:[^\s]+) already exists/;
 
 // SNS Service interfaces
 export interface SNSNotificationPayload {
@@ -17,6 +25,9 @@ export interface SNSNotificationPayload {
 export interface SNSPlatformEndpointRequest {
   deviceToken: string;
   customUserData?: string;
+  // Whether an existing endpoint for the token is updated with these attributes and re-enabled;
+  // otherwise it is returned unchanged
+  takeOver?: boolean;
 }
 
 export interface SNSPlatformEndpointResponse {
@@ -31,19 +42,34 @@ export interface SNSNotificationResponse {
   error?: string;
 }
 
+export interface SNSBatchPublishResponse {
+  success: boolean;
+  // Indexes (into the published messages) that SNS accepted
+  publishedIndexes: number[];
+  failed: number;
+  error?: string;
+}
+
 export interface SNSEndpointAttributes {
   customUserData?: string;
   enabled?: boolean;
 }
 
 export class SNSService {
-  private platformApplicationArn: string;
+  private readonly platformApplicationArn: string;
+  // Message key SNS reads the APNS payload from, matching the platform application
+  private readonly apnsMessageKey: 'APNS' | 'APNS_SANDBOX';
+  // Endpoint ARNs for direct tokens keyed by token fingerprint, in least recently used order
+  private directTokenEndpoints = new Map<string, string>();
 
   constructor() {
     this.platformApplicationArn = process.env.SNS_PLATFORM_APPLICATION_ARN || '';
     if (!this.platformApplicationArn) {
       console.warn('SNS_PLATFORM_APPLICATION_ARN environment variable not set');
     }
+
+    // Production applications have ARNs like arn:aws:sns:...:app/APNS/name; anything else keeps the sandbox key
+    this.apnsMessageKey = this.platformApplicationArn.includes(':app/APNS/') ? 'APNS' : 'APNS_SANDBOX';
   }
 
   /**
@@ -67,7 +93,9 @@ export class SNSService {
       const response = await snsClient.send(command);
       const endpointArn = response.EndpointArn;
       
-      console.log(`Created platform endpoint: ${endpointArn}`);
+      if (logPerDevice) {
+        console.log('Created platform endpoint: %s', endpointArn);
+      }
       
       return {
         success: true,
@@ -75,12 +103,15 @@ export class SNSService {
       };
 
     } catch (error) {
-      console.error('Failed to create platform endpoint:', error);
-      
       // Handle case where endpoint already exists with different attributes
-      if (error instanceof Error && error.message.includes('InvalidParameter')) {
-        return this.handleExistingEndpoint(request.deviceToken, request.customUserData);
+      if (error instanceof Error && (error.name === 'InvalidParameterException' || error.message.includes('InvalidParameter'))) {
+        const match = EXISTING_ENDPOINT_PATTERN.exec(error.message);
+        if (match) {
+          return this.handleExistingEndpoint(match[1], request);
+        }
       }
+
+      console.error('Failed to create platform endpoint:', error);
       
       return {
         success: false,
@@ -90,60 +121,49 @@ export class SNSService {
   }
 
   /**
-   * Handle existing endpoint by extracting ARN from error and updating attributes
+   * Handle an endpoint that already exists for the token
+   * Only a takeover updates its attributes; other callers reuse it as it is
    */
-  private async handleExistingEndpoint(deviceToken: string, customUserData?: string): Promise<SNSPlatformEndpointResponse> {
-    try {
-      // For now, return a dummy ARN so registration can complete
-      // In production, you would extract the actual ARN from the error message
-      const dummyArn = `arn:aws:sns:${process.env.AWS_REGION || 'us-east-1'}:${process.env.AWS_ACCOUNT_ID || '123456789012'}:app/APNS/dummy-endpoint-${customUserData || 'unknown'}`;
-      
-      console.warn('Device token already exists, using dummy ARN for now');
-      
+  private async handleExistingEndpoint(endpointArn: string, request: SNSPlatformEndpointRequest): Promise<SNSPlatformEndpointResponse> {
+    if (!request.takeOver) {
+      if (logPerDevice) {
+        console.log('Using existing platform endpoint: %s', endpointArn);
+      }
+
       return {
         success: true,
-        endpointArn: dummyArn
-      };
-    } catch (error) {
-      console.error('Failed to handle existing endpoint:', error);
-      return {
-        success: false,
-        error: error instanceof Error ? error.message : 'Unknown error'
+        endpointArn
       };
     }
+
+    if (logPerDevice) {
+      console.log('Taking over existing platform endpoint: %s', endpointArn);
+    }
+
+    // Take the endpoint over for this registration and re-enable it in case APNS disabled it
+    return this.updateEndpointAttributes(endpointArn, {
+      customUserData: request.customUserData,
+      enabled: true
+    });
   }
 
   /**
    * Send notification to a platform endpoint
+   * Accepts either a payload or a message already built with buildMessage
    */
-  async sendNotificationToEndpoint(endpointArn: string, payload: SNSNotificationPayload): Promise<SNSNotificationResponse> {
+  async sendNotificationToEndpoint(endpointArn: string, payload: SNSNotificationPayload | string): Promise<SNSNotificationResponse> {
     try {
-      // Create the payload for iOS APNS
-      const snsPayload = {
-        APNS_SANDBOX: JSON.stringify({
-          aps: {
-            alert: {
-              title: payload.title,
-              body: payload.message
-            },
-            sound: payload.sound || 'default',
-            badge: payload.badge || 1
-          },
-          custom_data: payload.customData || {
-            timestamp: new Date().toISOString()
-          }
-        })
-      };
-
       const command = new PublishCommand({
         TargetArn: endpointArn,
-        Message: JSON.stringify(snsPayload),
+        Message: typeof payload === 'string' ? payload : this.buildMessage(payload),
         MessageStructure: 'json'
       });
 
       const response = await snsClient.send(command);
       
-      console.log(`Notification sent successfully to ${endpointArn}: ${response.MessageId}`);
+      if (logPerDevice) {
+        console.log('Notification sent successfully to %s: %s', endpointArn, response.MessageId);
+      }
 
       return {
         success: true,
@@ -151,7 +171,7 @@ export class SNSService {
       };
 
     } catch (error) {
-      console.error(`Failed to send notification to ${endpointArn}:`, error);
+      console.error('Failed to send notification to %s:', endpointArn, error);
       
       return {
         success: false,
@@ -161,9 +181,86 @@ export class SNSService {
   }
 
   /**
-   * Send notification to a direct device token (creates temporary endpoint)
+   * Publish messages to a topic with PublishBatch
+   * A failed batch doesn't stop later ones; success means every message was published
    */
-  async sendNotificationToDirectToken(deviceToken: string, payload: SNSNotificationPayload, customUserData?: string): Promise<SNSNotificationResponse> {
+  async publishBatchToTopic(topicArn: string, messages: string[]): Promise<SNSBatchPublishResponse> {
+    const publishedIndexes: number[] = [];
+    let lastError: string | undefined;
+
+    for (let i = 0; i < messages.length; i += PUBLISH_BATCH_SIZE) {
+      try {
+        const command = new PublishBatchCommand({
+          TopicArn: topicArn,
+          PublishBatchRequestEntries: messages
+            .slice(i, i + PUBLISH_BATCH_SIZE)
+            .map((message, index) => ({
+              Id: String(i + index),
+              Message: message
+            }))
+        });
+
+        const response = await snsClient.send(command);
+
+        for (const entry of response.Successful || []) {
+          publishedIndexes.push(Number(entry.Id));
+        }
+
+        for (const entry of response.Failed || []) {
+          console.error('Failed to publish batch entry %s to %s: %s %s', entry.Id, topicArn, entry.Code, entry.Message || '');
+          lastError = entry.Message || entry.Code;
+        }
+
+      } catch (error) {
+        console.error(`Failed to publish batch to ${topicArn}:`, error);
+        lastError = error instanceof Error ? error.message : 'Unknown error';
+      }
+    }
+
+    const failed = messages.length - publishedIndexes.length;
+
+    console.log(`Published ${publishedIndexes.length} of ${messages.length} messages to ${topicArn}`);
+
+    return {
+      success: failed === 0,
+      publishedIndexes,
+      failed,
+      error: failed > 0 ? `${failed} messages could not be published: ${lastError || 'Unknown error'}` : undefined
+    };
+  }
+
+  /**
+   * Build the SNS message for a notification payload
+   * The result can be reused when sending the same notification to many endpoints
+   */
+  buildMessage(payload: SNSNotificationPayload): string {
+    // Create the payload for iOS APNS
+    const apnsPayload = JSON.stringify({
+      aps: {
+        alert: {
+          title: payload.title,
+          body: payload.message
+        },
+        sound: payload.sound || 'default',
+        badge: payload.badge || 1
+      },
+      custom_data: payload.customData
+    });
+
+    // MessageStructure=json is still required: a plain message is delivered to APNS as alert
+    // text only, dropping the title, sound, badge and custom data. The wrapper has a single
+    // key, so it is assembled directly instead of serializing a second object.
+    return `{"${this.apnsMessageKey}":${JSON.stringify(apnsPayload)}}`;
+  }
+
+  /**
+   * Send notification to a direct device token
+   * The endpoint created for the token is reused by later sends in the same container.
+   * It is not deleted: SNS keeps one endpoint per token, and registering the same token
+   * later takes that endpoint over (see handleExistingEndpoint). A token that is already
+   * registered is sent through its existing endpoint without changing its attributes.
+   */
+  async sendNotificationToDirectToken(deviceToken: string, payload: SNSNotificationPayload | string, customUserData?: string): Promise<SNSNotificationResponse> {
     try {
       if (!this.platformApplicationArn) {
         return {
@@ -172,27 +269,41 @@ export class SNSService {
         };
       }
 
-      // Create temporary endpoint
-      const createResponse = await this.createPlatformEndpoint({
-        deviceToken,
-        customUserData: customUserData || 'direct-token'
-      });
+      // Only a fingerprint of the token is kept in memory
+      const fingerprint = createHash('sha256').update(deviceToken).digest('hex').slice(0, 16);
+      let endpointArn = this.directTokenEndpoints.get(fingerprint);
 
-      if (!createResponse.success || !createResponse.endpointArn) {
-        return {
-          success: false,
-          error: createResponse.error || 'Failed to create platform endpoint'
-        };
+      if (endpointArn) {
+        // Refresh the entry's position so it is evicted last
+        this.directTokenEndpoints.delete(fingerprint);
+      } else {
+        const createResponse = await this.createPlatformEndpoint({
+          deviceToken,
+          customUserData: customUserData || 'direct-token'
+        });
+
+        if (!createResponse.success || !createResponse.endpointArn) {
+          return {
+            success: false,
+            error: createResponse.error || 'Failed to create platform endpoint'
+          };
+        }
+
+        endpointArn = createResponse.endpointArn;
       }
 
       // Send notification
-      const result = await this.sendNotificationToEndpoint(createResponse.endpointArn, payload);
+      const result = await this.sendNotificationToEndpoint(endpointArn, payload);
 
-      // Clean up temporary endpoint (optional - SNS will handle duplicates)
-      try {
-        await this.deleteEndpoint(createResponse.endpointArn);
-      } catch (cleanupError) {
-        console.warn('Failed to cleanup temporary endpoint:', cleanupError);
+      // Keep the endpoint for later sends to the same token unless it failed (e.g. disabled)
+      if (result.success) {
+        this.directTokenEndpoints.set(fingerprint, endpointArn);
+        if (this.directTokenEndpoints.size > DIRECT_ENDPOINT_CACHE_SIZE) {
+          const oldest = this.directTokenEndpoints.keys().next().value;
+          if (oldest !== undefined) {
+            this.directTokenEndpoints.delete(oldest);
+          }
+        }
       }
 
       return result;
@@ -227,7 +338,10 @@ export class SNSService {
       });
       
       await snsClient.send(command);
-      console.log(`Updated endpoint attributes: ${endpointArn}`);
+
+      if (logPerDevice) {
+        console.log('Updated endpoint attributes: %s', endpointArn);
+      }
       
       return {
         success: true,
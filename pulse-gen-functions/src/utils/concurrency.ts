@@ -0,0 +1,34 @@
+/**
+ * Run an async task per item with at most `limit` tasks in flight
+ * Items may come from an async iterable, in which case tasks start as soon as
+ * the first items arrive. Results are returned in the same order as the items.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: Iterable<T> | AsyncIterable<T>,
+  limit: number,
+  task: (item: T) => Promise<R>
+): Promise<R[]> {
+  const iterator: Iterator<T> | AsyncIterator<T> = Symbol.asyncIterator in items
+    ? (items as AsyncIterable<T>)[Symbol.asyncIterator]()
+    : (items as Iterable<T>)[Symbol.iterator]();
+  const results: R[] = [];
+  let nextIndex = 0;
+  let done = false;
+
+  const worker = async (): Promise<void> => {
+    while (!done) {
+      // Claim the index before awaiting so results keep the source order
+      const index = nextIndex++;
+      const next = await iterator.next();
+      if (next.done) {
+        done = true;
+        return;
+      }
+      results[index] = await task(next.value);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.max(1, limit) }, () => worker()));
+
+  return results;
+}
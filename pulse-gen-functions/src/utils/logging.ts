@@ -0,0 +1,6 @@
+/**
+ * Whether per-device log lines should be written
+ * Fan-out loops log one line per device, so these are only enabled when
+ * LOG_LEVEL is DEBUG or INFO; errors are always logged.
+ */
+export const logPerDevice = ['DEBUG', 'INFO'].includes((process.env.LOG_LEVEL || 'WARN').toUpperCase());
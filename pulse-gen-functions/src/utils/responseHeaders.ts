@@ -0,0 +1,10 @@
+/**
+ * Response headers for the main handler and the news and schedule routes
+ * Notification routes use their own headers (see notificationHandler)
+ */
+export const RESPONSE_HEADERS = {
+  'Content-Type': 'application/json',
+  'Access-Control-Allow-Origin': '*',
+  'Access-Control-Allow-Headers': 'Content-Type',
+  'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
+};
@@ -1,11 +1,43 @@
 import { NotificationRequest, DeviceRegistrationRequest } from '../services/notificationService';
 
+// Matches the uppercase letters that start each word of a camelCase key
+const CAMEL_CASE_BOUNDARY = /([A-Z])/g;
+
 export interface ValidationResult {
   isValid: boolean;
   errors: string[];
 }
 
 export class ValidationUtils {
+  /**
+   * Convert camelCase request keys to snake_case so later reads only check one name
+   */
+  static normalizeKeys(request: any): any {
+    if (!request || typeof request !== 'object') {
+      return request;
+    }
+
+    const normalized: Record<string, any> = {};
+    const aliases: Array<[string, string]> = [];
+    for (const key of Object.keys(request)) {
+      const normalizedKey = key.replace(CAMEL_CASE_BOUNDARY, '_$1').toLowerCase();
+      if (normalizedKey === key) {
+        normalized[key] = request[key];
+      } else {
+        aliases.push([normalizedKey, key]);
+      }
+    }
+
+    // Same precedence as `request.device_token || request.deviceToken`: a camelCase
+    // alias only fills in when the snake_case value is missing or empty
+    for (const [normalizedKey, key] of aliases) {
+      if (!normalized[normalizedKey]) {
+        normalized[normalizedKey] = request[key];
+      }
+    }
+    return normalized;
+  }
+
   /**
    * Validate notification request
    */
@@ -13,9 +45,9 @@ export class ValidationUtils {
     const errors: string[] = [];
 
     // Check if at least one target is specified
-    const hasUserId = request.user_id || request.userId;
-    const hasDeviceId = request.device_id || request.deviceId;
-    const hasDeviceToken = request.device_token || request.deviceToken;
+    const hasUserId = request.user_id;
+    const hasDeviceId = request.device_id;
+    const hasDeviceToken = request.device_token;
 
     if (!hasUserId && !hasDeviceId && !hasDeviceToken) {
       errors.push('At least one target must be specified: user_id, device_id, or device_token');
@@ -46,7 +78,7 @@ export class ValidationUtils {
     const errors: string[] = [];
 
     // Check required fields
-    const deviceToken = request.device_token || request.deviceToken;
+    const deviceToken = request.device_token;
     if (!deviceToken) {
       errors.push('device_token is required');
     } else if (typeof deviceToken !== 'string' || deviceToken.length === 0) {
@@ -54,19 +86,19 @@ export class ValidationUtils {
     }
 
     // Validate user_id if provided
-    const userId = request.user_id || request.userId;
+    const userId = request.user_id;
     if (userId && typeof userId !== 'string') {
       errors.push('user_id must be a string');
     }
 
     // Validate device_id if provided
-    const deviceId = request.device_id || request.deviceId;
+    const deviceId = request.device_id;
     if (deviceId && typeof deviceId !== 'string') {
       errors.push('device_id must be a string');
     }
 
     // Validate bundle_id if provided
-    const bundleId = request.bundle_id || request.bundleId;
+    const bundleId = request.bundle_id;
     if (bundleId && typeof bundleId !== 'string') {
       errors.push('bundle_id must be a string');
     }
@@ -142,12 +174,10 @@ export class ValidationUtils {
     return {
       message: request.message,
       title: request.title,
-      user_id: request.user_id || request.userId,
-      userId: request.userId || request.user_id,
-      device_id: request.device_id || request.deviceId,
-      deviceId: request.deviceId || request.device_id,
-      device_token: request.device_token || request.deviceToken,
-      deviceToken: request.deviceToken || request.device_token
+      user_id: request.user_id,
+      device_id: request.device_id,
+      device_token: request.device_token,
+      async: request.async === true || request.async === 'true'
     };
   }
 
@@ -156,14 +186,10 @@ export class ValidationUtils {
    */
   static sanitizeDeviceRegistrationRequest(request: any): DeviceRegistrationRequest {
     return {
-      device_token: request.device_token || request.deviceToken,
-      deviceToken: request.deviceToken || request.device_token,
-      user_id: request.user_id || request.userId,
-      userId: request.userId || request.user_id,
-      device_id: request.device_id || request.deviceId,
-      deviceId: request.deviceId || request.device_id,
-      bundle_id: request.bundle_id || request.bundleId,
-      bundleId: request.bundleId || request.bundle_id,
+      device_token: request.device_token,
+      user_id: request.user_id,
+      device_id: request.device_id,
+      bundle_id: request.bundle_id,
       platform: request.platform,
       timestamp: request.timestamp
     };